@@ -1,52 +1,91 @@
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend, also used by the plotting worker processes
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from collections import Counter
 import os
+import concurrent.futures
 
+# numba is optional: when available, the AA composition kernel is JIT-compiled
+# and runs in parallel over sequences; otherwise a NumPy fallback is used.
+try:
+    import numba
+    prange = numba.prange
+except ImportError:
+    numba = None
+    prange = range
 
-def compute_aa_freq(seq, aa_keys):
+
+def compute_aa_freq(seq, aa_codes):
     """
     Compute normalized amino acid frequency (%) for a given sequence.
-    Returns a dictionary {amino_acid: frequency}.
+    Returns an array with one frequency per code in aa_codes (ASCII values).
     """
-    seq = seq.upper()
-    counts = Counter(seq)
-    total = sum(counts.values())
-    if total == 0:
-        return {aa: 0 for aa in aa_keys}
-    return {aa: (counts.get(aa, 0) / total) * 100 for aa in aa_keys}
+    arr = np.frombuffer(seq.upper().encode('ascii'), dtype=np.uint8)
+    if arr.size == 0:
+        return np.zeros(len(aa_codes))
+    counts = np.bincount(arr, minlength=256)
+    return (counts[aa_codes] / arr.size) * 100
 
 
-def average_freq(df_subset, aa_keys):
+def _aa_composition_kernel(buf, offsets, code_lut, out):
     """
-    Calculate the average amino acid frequency across a dataframe subset.
+    Fill out[i] with the amino acid frequencies (%) of the i-th packed sequence.
+    Sequence i spans buf[offsets[i]:offsets[i + 1]]; code_lut maps each byte to
+    its column in out, or to -1 for residues that are not counted.
     """
-    freq_dicts = df_subset['aa_freq'].tolist()
-    if not freq_dicts:
-        return {aa: 0 for aa in aa_keys}
-    avg = {aa: sum(d[aa] for d in freq_dicts) / len(freq_dicts) for aa in aa_keys}
-    return avg
+    for i in prange(len(offsets) - 1):
+        length = offsets[i + 1] - offsets[i]
+        if length == 0:
+            continue
+        counts = np.zeros(out.shape[1])
+        for j in range(offsets[i], offsets[i + 1]):
+            k = code_lut[buf[j]]
+            if k >= 0:
+                counts[k] += 1
+        out[i] = counts * (100.0 / length)
 
 
-def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_output"):
+if numba is not None:
+    _aa_composition_kernel = numba.njit(parallel=True, cache=True)(_aa_composition_kernel)
+
+
+def compute_aa_matrix(sequences, aa_codes):
     """
-    Main function to run the data analysis and visualization script.
+    Stack the amino acid frequencies of several sequences into an (N, n_aa) float32 matrix.
     """
-    # --- Configuration ---
-    # General output path for all generated files
-    output_path = "analysis_output"
-    
-    # --- Setup ---
-    # Define the path for plots within the general output directory
-    plots_path = os.path.join(output_path, 'plots')
-    
-    # Create the output directories if they don't exist
-    os.makedirs(plots_path, exist_ok=True)
-    print(f"Output will be saved to the '{output_path}' directory.")
+    if len(sequences) == 0:
+        return np.zeros((0, len(aa_codes)), dtype=np.float32)
+    if numba is None:
+        return np.stack([compute_aa_freq(seq, aa_codes) for seq in sequences]).astype(np.float32)
+
+    # Pack all sequences into one byte buffer delimited by offsets for the JIT kernel
+    encoded = [seq.upper().encode('ascii') for seq in sequences]
+    buf = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(seq) for seq in encoded], out=offsets[1:])
+    code_lut = np.full(256, -1, dtype=np.int8)
+    code_lut[aa_codes] = np.arange(len(aa_codes))
+
+    out = np.zeros((len(encoded), len(aa_codes)), dtype=np.float32)
+    _aa_composition_kernel(buf, offsets, code_lut, out)
+    return out
 
-    # Set the global theme for all plots
+
+def average_freq(freqs):
+    """
+    Calculate the average amino acid frequency across the rows of a frequency matrix.
+    """
+    if len(freqs) == 0:
+        return np.zeros(freqs.shape[1])
+    return freqs.mean(axis=0)
+
+
+def set_plot_theme():
+    """
+    Set the global theme for all plots. Also used to initialize the plotting worker processes.
+    """
     sns.set_theme(
         context="notebook",
         style="darkgrid",
@@ -56,72 +95,30 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
         color_codes=True,
         rc=None
     )
-
-    # Load the dataset
-    try:
-        df = pd.read_csv(input_data, sep="\t")
-    except FileNotFoundError:
-        print("Error: The file '/content/merged_dataset_with_seqs.tsv' was not found.")
-        print("Please make sure the dataset file is in the correct directory.")
-        return
-
-    # Create data subsets. Using .copy() to avoid SettingWithCopyWarning later.
-    df_train = df[df["Type"] == "train"].copy()
-    df_test = df[df["Type"] == "test"].copy()
-    df_pos = df[df["label"] == 1].copy()
-    df_neg = df[df["label"] == 0].copy()
-
-    print("Data loaded successfully. Here are the first 5 rows:")
-    print(df.head())
-
-    # --- Analysis of Protein Lengths ---
-
-    ## Plot 1: Density of protein lengths (Positive vs. Negative) in the whole dataset
     sns.set_style("whitegrid")
-    plt.figure(figsize=(10, 6))
-    sns.kdeplot(data=df, x='Protein_Length', hue='label', fill=True, common_norm=False, palette={1: 'lightgreen', 0: 'orangered'})
-    plt.title('Density Plot of Protein Lengths In The Whole Dataset', fontsize=16)
-    plt.xlabel('Protein Length (amino acids)', fontsize=12)
-    plt.ylabel('Density', fontsize=12)
-    plt.xlim(0, 3000)
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_path, 'Density_Plot_of_Protein_Lengths_Whole_Dataset.png'))
-    
 
-    ## Plot 2: Density of protein lengths in Train vs. Test sets
-    plt.figure(figsize=(10, 6))
-    sns.kdeplot(data=df, x='Protein_Length', hue='Type', fill=True, common_norm=False, palette={"train": 'lightgreen', "test": 'orangered'})
-    plt.title('Density Plot of Protein Lengths in Train and Test sets', fontsize=16)
-    plt.xlabel('Protein Length (amino acids)', fontsize=12)
-    plt.ylabel('Density', fontsize=12)
-    plt.xlim(0, 3000)
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_path, 'Density_Plot_of_Protein_Lengths_Train_vs_Test.png'))
-    
 
-    ## Plot 3: Density of protein lengths in the Train set (Positive vs. Negative)
-    plt.figure(figsize=(10, 6))
-    sns.kdeplot(data=df_train, x='Protein_Length', hue='label', fill=True, common_norm=False, palette={1: 'lightgreen', 0: 'orangered'})
-    plt.title('Density Plot of Protein Lengths in Train Set', fontsize=16)
-    plt.xlabel('Protein Length (amino acids)', fontsize=12)
-    plt.ylabel('Density', fontsize=12)
-    plt.xlim(0, 3000)
-    plt.tight_layout()
-    plt.savefig(os.path.join(plots_path, 'Density_Plot_of_Protein_Lengths_in_Train_Set.png'))
-    
+# --- Analysis of Protein Lengths ---
 
-    ## Plot 4: Density of protein lengths in the Test set (Positive vs. Negative)
+def plot_length_density(data, hue, palette, title, file_name, plots_path):
+    """
+    Plots 1-4: Density of protein lengths, split by the given hue column.
+    """
     plt.figure(figsize=(10, 6))
-    sns.kdeplot(data=df_test, x='Protein_Length', hue='label', fill=True, common_norm=False, palette={1: 'lightgreen', 0: 'orangered'})
-    plt.title('Density Plot of Protein Lengths in Test Set', fontsize=16)
+    sns.kdeplot(data=data, x='Protein_Length', hue=hue, fill=True, common_norm=False, palette=palette)
+    plt.title(title, fontsize=16)
     plt.xlabel('Protein Length (amino acids)', fontsize=12)
     plt.ylabel('Density', fontsize=12)
     plt.xlim(0, 3000)
     plt.tight_layout()
-    plt.savefig(os.path.join(plots_path, 'Density_Plot_of_Protein_Lengths_in_Test_Set.png'))
-    
+    plt.savefig(os.path.join(plots_path, file_name))
+    plt.close()
+
 
-    ## Plot 5: Boxplot of protein lengths by label
+def plot_length_boxplot(df, plots_path):
+    """
+    Plot 5: Boxplot of protein lengths by label.
+    """
     plt.figure(figsize=(10, 6))
     sns.boxplot(data=df, x="label", y="Protein_Length", hue="label", palette={1: 'springgreen', 0: 'orangered'})
     plt.title('Boxplot of Protein Lengths by Label', fontsize=16)
@@ -131,43 +128,31 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
     plt.ylim(0, 3000)
     plt.tight_layout()
     plt.savefig(os.path.join(plots_path, 'Boxplot_of_Protein_Lengths_by_Train_Test.png'))
-    
+    plt.close()
+
 
-    # --- Analysis of Signal Peptide (SP) Lengths ---
+# --- Analysis of Signal Peptide (SP) Lengths ---
 
-    ## Plot 6: Distribution of SP cleavage sites
+def plot_cleavage_sites(df_pos, plots_path):
+    """
+    Plot 6: Distribution of SP cleavage sites.
+    """
     plt.figure(figsize=(10, 6))
-    df_positive_only = df[df['label'] == 1]
-    sns.histplot(data=df_positive_only, x='Cleavage_Site', hue="Type", kde=True)
+    sns.histplot(data=df_pos, x='Cleavage_Site', hue="Type", kde=True)
     plt.title('Distribution of SP Cleavage Sites (Train vs Test)', fontsize=16)
     plt.xlabel('SP Cleavage Site Position', fontsize=12)
     plt.ylabel('Count', fontsize=12)
     plt.tight_layout()
     plt.savefig(os.path.join(plots_path, 'Distribution_of_SP_Cleavage_Sites.png'))
-    
+    plt.close()
 
-    # --- Amino Acid Composition Analysis ---
 
-    # Background amino acid frequencies from SwissProt/ExPASy
-    aa_freq_expasy = {
-        'A': 8.25, 'Q': 3.93, 'L': 9.64, 'S': 6.65, 'R': 5.52, 'E': 6.71,
-        'K': 5.79, 'T': 5.36, 'N': 4.06, 'G': 7.07, 'M': 2.41, 'W': 1.1,
-        'D': 5.46, 'H': 2.27, 'F': 3.86, 'Y': 2.92, 'C': 1.38, 'I': 5.9,
-        'P': 4.74, 'V': 6.85
-    }
-    aas = list(aa_freq_expasy.keys())
-
-    ## Plot 7: Comparative AA composition (Positive vs. Negative)
-    df_pos['aa_freq'] = df_pos['Sequence'].apply(lambda seq: compute_aa_freq(seq, aas))
-    df_neg['aa_freq'] = df_neg['Sequence'].apply(lambda seq: compute_aa_freq(seq, aas))
-    
-    avg_pos = average_freq(df_pos, aas)
-    avg_neg = average_freq(df_neg, aas)
-
-    pos_freqs = [avg_pos[aa] for aa in aas]
-    neg_freqs = [avg_neg[aa] for aa in aas]
-    bg_freqs  = [aa_freq_expasy[aa] for aa in aas]
+# --- Amino Acid Composition Analysis ---
 
+def plot_aa_composition_pos_neg(aas, pos_freqs, neg_freqs, bg_freqs, plots_path):
+    """
+    Plot 7: Comparative AA composition (Positive vs. Negative).
+    """
     x = np.arange(len(aas))
     width = 0.35
     plt.figure(figsize=(14, 6))
@@ -181,18 +166,15 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
     plt.legend()
     plt.tight_layout()
     plt.savefig(os.path.join(plots_path, 'AA_Composition_Positive_vs_Negative.png'))
-    
-
-    ## Plot 8: Comparative AA composition (Train vs. Test)
-    df_train['aa_freq'] = df_train['Sequence'].apply(lambda seq: compute_aa_freq(seq, aas))
-    df_test['aa_freq'] = df_test['Sequence'].apply(lambda seq: compute_aa_freq(seq, aas))
+    plt.close()
 
-    avg_train = average_freq(df_train, aas)
-    avg_test = average_freq(df_test, aas)
-
-    train_freqs = [avg_train[aa] for aa in aas]
-    test_freqs = [avg_test[aa] for aa in aas]
 
+def plot_aa_composition_train_test(aas, train_freqs, test_freqs, bg_freqs, plots_path):
+    """
+    Plot 8: Comparative AA composition (Train vs. Test).
+    """
+    x = np.arange(len(aas))
+    width = 0.35
     plt.figure(figsize=(14, 6))
     plt.bar(x - width/2, train_freqs, width, label='Train', alpha=0.7, color='plum')
     plt.bar(x + width/2, test_freqs, width, label='Test', alpha=0.7, color='skyblue')
@@ -204,11 +186,15 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
     plt.legend(loc='upper right')
     plt.tight_layout()
     plt.savefig(os.path.join(plots_path, 'AA_Composition_Train_vs_Test.png'))
-    
+    plt.close()
+
 
-    # --- Taxonomic Classification Analysis ---
+# --- Taxonomic Classification Analysis ---
 
-    ## Plot 9: Bar chart of Kingdom distribution
+def plot_kingdom_bar_chart(df, plots_path):
+    """
+    Plot 9: Bar chart of Kingdom distribution.
+    """
     plt.figure(figsize=(10, 6))
     sns.countplot(data=df, x='Kingdom', hue='Type', palette={"train": 'plum', "test": 'skyblue'})
     plt.title('Taxonomy Classification - Train vs Test', fontsize=16)
@@ -216,11 +202,16 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
     plt.ylabel('Count', fontsize=12)
     plt.tight_layout()
     plt.savefig(os.path.join(plots_path, 'Taxonomy_Classification_Bar_Chart.png'))
-    
+    plt.close()
+
 
-    ## Plot 10: Pie charts of Kingdom distribution
-    df_train_kingdom_n = df_train['Kingdom'].value_counts()
-    df_test_kingdom_n = df_test['Kingdom'].value_counts()
+def plot_kingdom_pie_charts(df_train, df_test, plots_path):
+    """
+    Plot 10: Pie charts of Kingdom distribution.
+    """
+    # Drop kingdoms missing from a set so they don't show up as empty wedges
+    df_train_kingdom_n = df_train['Kingdom'].cat.remove_unused_categories().value_counts()
+    df_test_kingdom_n = df_test['Kingdom'].cat.remove_unused_categories().value_counts()
     colors = ["salmon", "lightblue", "lightgreen", "hotpink"]
 
     fig, axes = plt.subplots(1, 2, figsize=(14, 7))
@@ -231,39 +222,33 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
     axes[1].set_title('Test Set: Distribution of Kingdoms')
     axes[1].axis('equal')
     plt.savefig(os.path.join(plots_path, 'Kingdom_Classification_Pie_Charts.png'))
-    
-    
-    # Plot 11: Pie charts of Organism distribution
-    df_train_processed = df_train.copy()
-    df_test_processed = df_test.copy()
-
-    # 1. Initial Organism Counts (using original df_train for the counts)
-    # Note: df is not modified, so we can keep the first line as is for labels.
-    labels = df['Organism'].unique()
-    df_train_organism_n = df_train_processed['Organism'].value_counts()
-    df_test_organism_n = df_test_processed['Organism'].value_counts()
-    colors = ["salmon", "lightblue", "lightgreen", "hotpink"]
-
-    # set a threshold and change the name of the organisms below that to "Other"
-    threshold = 500 
+    plt.close(fig)
 
-    organisms_to_group = df_train_organism_n[df_train_organism_n < threshold].index
-
-    # 2. Apply grouping to the COPIED training set
-    df_train_processed.loc[df_train_processed['Organism'].isin(organisms_to_group), 'Organism'] = 'Other'
 
+def plot_organism_pie_charts(df_train, df_test, plots_path):
+    """
+    Plot 11: Pie charts of Organism distribution.
+    """
+    colors = ["salmon", "lightblue", "lightgreen", "hotpink"]
 
-    organisms_to_keep_train = df_train_processed['Organism'].unique() # Get the new labels from the modified train set
+    # set a threshold and change the name of the organisms below that to "Other"
+    threshold = 500
 
-    # 3. Apply grouping to the COPIED test set
-    # Group anything in the test set that is NOT one of the 'kept' train organisms
-    df_test_processed.loc[~df_test_processed['Organism'].isin(organisms_to_keep_train), 'Organism'] = 'Other'
+    # 1. Organisms to keep: those reaching the threshold in the training set
+    df_train_organism_n = df_train['Organism'].value_counts()
+    organisms_to_keep = set(df_train_organism_n[df_train_organism_n >= threshold].index)
 
-    # 4. Re-calculate value counts using the NEW processed dataframes
-    df_train_organism_n_new = df_train_processed['Organism'].value_counts()
-    df_test_organism_n_new = df_test_processed['Organism'].value_counts()
+    # 2. Group everything else as "Other" in both sets. Organism is categorical, so
+    # "Other" must be a known category before it can be used as a value
+    train_organism = df_train['Organism'].cat.add_categories('Other')
+    train_organism = train_organism.where(train_organism.isin(organisms_to_keep), 'Other')
+    test_organism = df_test['Organism'].cat.add_categories('Other')
+    test_organism = test_organism.where(test_organism.isin(organisms_to_keep), 'Other')
 
-    df_train_organism_n_new
+    # 3. Re-calculate value counts on the grouped organisms
+    # Drop the categories that no longer occur so they don't show up as empty wedges
+    df_train_organism_n_new = train_organism.cat.remove_unused_categories().value_counts()
+    df_test_organism_n_new = test_organism.cat.remove_unused_categories().value_counts()
 
 
     ### Plotting
@@ -280,34 +265,131 @@ def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_outp
 
     #save
     plt.savefig(os.path.join(plots_path, 'Organism_Classification_Pie_Charts.png'))
+    plt.close(fig)
+
+
+def main(input_data = "merged_dataset_with_seqs.tsv", output_path="analysis_output"):
+    """
+    Main function to run the data analysis and visualization script.
+    """
+    # --- Configuration ---
+    # General output path for all generated files
+    output_path = "analysis_output"
+    
+    # --- Setup ---
+    # Define the path for plots within the general output directory
+    plots_path = os.path.join(output_path, 'plots')
     
+    # Create the output directories if they don't exist
+    os.makedirs(plots_path, exist_ok=True)
+    print(f"Output will be saved to the '{output_path}' directory.")
+
+    # Load the dataset
+    try:
+        # Low-cardinality text columns are loaded as categoricals; the explicit
+        # category order keeps the original ordering in plot legends and axes.
+        # Numeric columns use the smallest integer types that fit their values
+        # (Cleavage_Site is nullable, it is empty for negative entries).
+        df = pd.read_csv(input_data, sep="\t", dtype={
+            'Kingdom': pd.CategoricalDtype(['Metazoa', 'Fungi', 'Plants', 'Other']),
+            'Type': pd.CategoricalDtype(['train', 'test']),
+            'Organism': 'category',
+            'Protein_Length': 'int32',
+            'Cleavage_Site': 'Int16',
+            'label': 'int8',
+        })
+    except FileNotFoundError:
+        print("Error: The file '/content/merged_dataset_with_seqs.tsv' was not found.")
+        print("Please make sure the dataset file is in the correct directory.")
+        return
+
+    # Create data subset masks. Per-sequence AA frequencies are kept in a separate matrix
+    # rather than as DataFrame columns, so the subsets are never written to and need no copy.
+    is_train = (df["Type"] == "train").values
+    is_test = (df["Type"] == "test").values
+    is_pos = (df["label"] == 1).values
+    is_neg = (df["label"] == 0).values
+    df_pos = df[is_pos]
+
+    print("Data loaded successfully. Here are the first 5 rows:")
+    print(df.head())
+
+    # The plots don't use the sequences, so they are left out of the frames sent to the workers
+    df_plot = df.drop(columns='Sequence')
+    df_plot_train = df_plot[is_train]
+    df_plot_test = df_plot[is_test]
+    df_plot_pos = df_plot[is_pos]
+
+    # Background amino acid frequencies from SwissProt/ExPASy
+    aa_freq_expasy = {
+        'A': 8.25, 'Q': 3.93, 'L': 9.64, 'S': 6.65, 'R': 5.52, 'E': 6.71,
+        'K': 5.79, 'T': 5.36, 'N': 4.06, 'G': 7.07, 'M': 2.41, 'W': 1.1,
+        'D': 5.46, 'H': 2.27, 'F': 3.86, 'Y': 2.92, 'C': 1.38, 'I': 5.9,
+        'P': 4.74, 'V': 6.85
+    }
+    aas = list(aa_freq_expasy.keys())
+    aa_codes = np.array([ord(aa) for aa in aas], dtype=np.uint8)
+    bg_freqs  = [aa_freq_expasy[aa] for aa in aas]
+
+    label_palette = {1: 'lightgreen', 0: 'orangered'}
+    type_palette = {"train": 'lightgreen', "test": 'orangered'}
+
+    # Each plot is rendered in its own worker process, so they are drawn concurrently
+    plot_jobs = [
+        (plot_length_density, (df_plot, 'label', label_palette, 'Density Plot of Protein Lengths In The Whole Dataset', 'Density_Plot_of_Protein_Lengths_Whole_Dataset.png', plots_path)),
+        (plot_length_density, (df_plot, 'Type', type_palette, 'Density Plot of Protein Lengths in Train and Test sets', 'Density_Plot_of_Protein_Lengths_Train_vs_Test.png', plots_path)),
+        (plot_length_density, (df_plot_train, 'label', label_palette, 'Density Plot of Protein Lengths in Train Set', 'Density_Plot_of_Protein_Lengths_in_Train_Set.png', plots_path)),
+        (plot_length_density, (df_plot_test, 'label', label_palette, 'Density Plot of Protein Lengths in Test Set', 'Density_Plot_of_Protein_Lengths_in_Test_Set.png', plots_path)),
+        (plot_length_boxplot, (df_plot, plots_path)),
+        (plot_cleavage_sites, (df_plot_pos, plots_path)),
+        (plot_kingdom_bar_chart, (df_plot, plots_path)),
+        (plot_kingdom_pie_charts, (df_plot_train, df_plot_test, plots_path)),
+        (plot_organism_pie_charts, (df_plot_train, df_plot_test, plots_path)),
+    ]
+
+    # Two more workers for the AA composition plots, which are submitted once their data is ready
+    max_workers = min(len(plot_jobs) + 2, os.cpu_count() or 1)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=set_plot_theme) as executor:
+        futures = [executor.submit(plot_function, *args) for plot_function, args in plot_jobs]
+
+        # Compute the composition of every sequence once while the other plots render;
+        # each subset is a row mask of this matrix
+        aa_mat = compute_aa_matrix(df['Sequence'].values, aa_codes)
+        pos_freqs = average_freq(aa_mat[is_pos]).tolist()
+        neg_freqs = average_freq(aa_mat[is_neg]).tolist()
+        train_freqs = average_freq(aa_mat[is_train]).tolist()
+        test_freqs = average_freq(aa_mat[is_test]).tolist()
+
+        futures.append(executor.submit(plot_aa_composition_pos_neg, aas, pos_freqs, neg_freqs, bg_freqs, plots_path))
+        futures.append(executor.submit(plot_aa_composition_train_test, aas, train_freqs, test_freqs, bg_freqs, plots_path))
+
+        # Re-raise any error from the workers
+        for future in futures:
+            future.result()
 
     # --- Sequence Motif Extraction ---
 
-    motifs = []
-    for _, row in df_pos.iterrows():
-        sequence = row['Sequence']
-        cleavage_site = row['Cleavage_Site']
-        
-        # Ensure cleavage site is a valid number and within sequence bounds
-        try:
-            # Convert cleavage site to 0-based index
-            cleavage_site_idx = int(cleavage_site) - 1
-            start = cleavage_site_idx - 13
-            end = cleavage_site_idx + 2
-            if start >= 0 and end <= len(sequence):
-                motifs.append(sequence[start:end])
-        except (ValueError, TypeError):
-            # Skip if cleavage site is not a valid number
-            continue
+    # Convert cleavage sites to 0-based indices; invalid values become <NA> and are skipped
+    cleavage_site_idx = pd.to_numeric(df_pos['Cleavage_Site'], errors='coerce').astype('Int64') - 1
+    start = cleavage_site_idx - 13
+    end = cleavage_site_idx + 2
+    # Keep only motifs that fall within the sequence bounds
+    in_bounds = (start.ge(0) & end.le(df_pos['Sequence'].str.len())).fillna(False).astype(bool)
+    motifs = [
+        sequence[motif_start:motif_end]
+        for sequence, motif_start, motif_end in zip(
+            df_pos.loc[in_bounds, 'Sequence'].values,
+            start[in_bounds].to_numpy(),
+            end[in_bounds].to_numpy(),
+        )
+    ]
 
     # Define the full path for the motifs file
     motifs_filepath = os.path.join(output_path, 'motifs.txt')
     
     # Write the extracted motifs to the text file
     with open(motifs_filepath, 'w') as f:
-        for motif in motifs:
-            f.write(f"{motif}\n")
+        f.write(''.join(f"{motif}\n" for motif in motifs))
             
     print(f"\nSuccessfully extracted and saved {len(motifs)} motifs to '{motifs_filepath}'")
 
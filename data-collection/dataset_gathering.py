@@ -4,7 +4,8 @@ positive and negative datasets for signal peptide analysis.
 
 The script performs the following steps:
 1. Defines a session with retry logic for robust API calls.
-2. Implements a pagination mechanism to handle large search results.
+2. Implements a pagination mechanism to handle large search results, downloading
+   the next page in a background thread while the current one is processed.
 3. Fetches a positive dataset of proteins with experimental signal peptides.
 4. Extracts specific fields (including sequence) and filters the data based on defined criteria.
 5. Fetches a negative dataset of proteins that are secreted but lack a
@@ -18,10 +19,20 @@ The script performs the following steps:
 import requests
 import re
 import json
+import queue
+import threading
 import pandas as pd
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# orjson is optional: when available it is used to decode the API responses,
+# otherwise the standard library json module is used.
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # We use the Session object to allow retries in case of temporary service unavailability.
 # This configures it to try up to 5 times if it encounters specific server errors.
 retries = Retry(total=5, backoff_factor=0.25, status_forcelist=[500, 502, 503, 504])
@@ -40,11 +51,12 @@ def get_next_link(headers):
             return match.group(1)
     return None
 
-def get_batch(batch_url):
+def get_batch(batch_url, stop_event=None):
     """
     Retrieves data one batch (page) at a time from a given URL.
+    If a stop_event is given, no further page is requested once it is set.
     """
-    while batch_url:
+    while batch_url and not (stop_event is not None and stop_event.is_set()):
         # Run the API call
         response = session.get(batch_url)
         # Will raise an error if an unsuccessful status code is obtained
@@ -56,6 +68,22 @@ def get_batch(batch_url):
         # Get the link to the API call for the next data batch
         batch_url = get_next_link(response.headers)
 
+def fetch_batches(batch_url, batch_queue, stop_event):
+    """
+    Downloads every batch (page) of a search and puts its raw content on a queue.
+
+    Runs in a background thread so the next page is fetched while the previous one
+    is being parsed. Puts None on the queue when done, or the exception if one occurs.
+    Stops requesting pages once stop_event is set by the consumer.
+    """
+    try:
+        for response, total in get_batch(batch_url, stop_event):
+            batch_queue.put((response.content, total))
+    except Exception as e:
+        batch_queue.put(e)
+    else:
+        batch_queue.put(None)
+
 def get_eukaryotic_kingdom(lineage):
     """
     Categorizes an organism into Metazoa, Fungi, Plants, or Other based on its lineage.
@@ -144,30 +172,51 @@ def get_dataset(search_url, extract_function, output_file_name, header):
     processed_sequences = {}
     n_total = 0
 
-    # Run the API call in batches
-    for batch, total in get_batch(search_url):
-        batch_json = json.loads(batch.text)
-        for entry in batch_json["results"]:
-            fields = extract_function(entry)
-            if fields is not None:
-                # Unpack all fields, the last one is the sequence
-                *tsv_fields, sequence = fields
-                accession = tsv_fields[0]
-                
-                processed_entries_tsv.append(tsv_fields)
-                processed_sequences[accession] = sequence
-
-            n_total += 1
-        print(f"Processed {n_total} of {total} entries...")
+    # Run the API call in batches, fetching the next page while the current one is processed
+    batch_queue = queue.Queue(maxsize=2)
+    stop_event = threading.Event()
+    fetcher = threading.Thread(target=fetch_batches, args=(search_url, batch_queue, stop_event), daemon=True)
+    fetcher.start()
+
+    try:
+        while True:
+            item = batch_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            content, total = item
+            batch_json = json_loads(content)
+            for entry in batch_json["results"]:
+                fields = extract_function(entry)
+                if fields is not None:
+                    # Unpack all fields, the last one is the sequence
+                    *tsv_fields, sequence = fields
+                    accession = tsv_fields[0]
+                    
+                    processed_entries_tsv.append(tsv_fields)
+                    processed_sequences[accession] = sequence
+
+                n_total += 1
+            print(f"Processed {n_total} of {total} entries...")
+    finally:
+        # Tell the fetcher to stop and unblock it if it is waiting on a full queue
+        stop_event.set()
+        while True:
+            try:
+                batch_queue.get_nowait()
+            except queue.Empty:
+                break
+        fetcher.join()
 
     print(f"\nFinished processing. Found {len(processed_sequences)} proteins matching the criteria.")
 
     # Write the extracted metadata to a TSV file
-    with open(output_file_name, "w") as ofs:
+    with open(output_file_name, "w", buffering=1 << 20) as ofs:
         # Write the new header row as specified
         ofs.write(header + "\n")
-        for fields in processed_entries_tsv:
-            print(*fields, sep="\t", file=ofs)
+        # Fields are written unquoted, exactly as str() renders them
+        ofs.write("".join("\t".join(map(str, fields)) + "\n" for fields in processed_entries_tsv))
 
     print(f"Successfully saved data to {output_file_name}")
     return processed_sequences
@@ -177,12 +226,13 @@ def save_fasta_file(sequences_data, output_file_name):
     Saves a dictionary of protein sequences to a FASTA file.
     """
     try:
+        # Wrap sequence to 60 characters per line for standard FASTA format
+        records = [
+            f">{accession}\n" + "".join(sequence[i:i+60] + "\n" for i in range(0, len(sequence), 60))
+            for accession, sequence in sequences_data.items()
+        ]
         with open(output_file_name, "w") as f:
-            for accession, sequence in sequences_data.items():
-                f.write(f">{accession}\n")
-                # Wrap sequence to 60 characters per line for standard FASTA format
-                for i in range(0, len(sequence), 60):
-                    f.write(sequence[i:i+60] + "\n")
+            f.write("".join(records))
         print(f"Successfully saved sequences to {output_file_name}")
     except IOError as e:
         print(f"Error writing FASTA file: {e}")
@@ -3,22 +3,22 @@ import numpy as np
 from sklearn.model_selection import train_test_split, StratifiedKFold
 import subprocess
 import os
+import shutil
 import tabulate
 
 def parse_fasta(file_path):
     """
     Parses a FASTA file and returns a dictionary of sequences.
     """
-    sequences = {}
-    current_id = None
     with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith('>'):
-                current_id = line[1:].split()[0]
-                sequences[current_id] = ''
-            elif current_id:
-                sequences[current_id] += line
+        data = f.read()
+    sequences = {}
+    # Every record starts with "\n>", so a single split yields one chunk per record
+    for record in ('\n' + data).split('\n>')[1:]:
+        header, _, body = record.partition('\n')
+        fields = header.split()
+        if fields:
+            sequences[fields[0]] = ''.join(body.split())
     return sequences
 
 def main():
@@ -40,21 +40,24 @@ def main():
             print(f"Error: Input file not found at {f}")
             return
 
-    # Load cluster data
-    neg_cluster = pd.read_csv(neg_cluster_file, sep="\t", header=None)
-    pos_cluster = pd.read_csv(pos_cluster_file, sep="\t", header=None)
+    # Load cluster data (only the representative column is needed)
+    neg_cluster = pd.read_csv(neg_cluster_file, sep="\t", header=None, usecols=[0], names=["rep"], engine="pyarrow", dtype_backend="pyarrow")
+    pos_cluster = pd.read_csv(pos_cluster_file, sep="\t", header=None, usecols=[0], names=["rep"], engine="pyarrow", dtype_backend="pyarrow")
 
-    # Load original datasets
-    og_neg = pd.read_csv(og_neg_file, sep="\t")
-    og_pos = pd.read_csv(og_pos_file, sep="\t")
+    # Load original datasets (all columns are carried into the output files)
+    og_neg = pd.read_csv(og_neg_file, sep="\t", engine="pyarrow")
+    og_pos = pd.read_csv(og_pos_file, sep="\t", engine="pyarrow")
 
     # Get representative sequences from clusters
-    rep_neg = neg_cluster[0].unique()
-    rep_pos = pos_cluster[0].unique()
+    rep_neg = neg_cluster["rep"].unique()
+    rep_pos = pos_cluster["rep"].unique()
 
-    # Filter original datasets to keep only representative sequences
-    og_neg_filter = og_neg[og_neg['Accession'].isin(rep_neg)].reset_index(drop=True)
-    og_pos_filter = og_pos[og_pos['Accession'].isin(rep_pos)].reset_index(drop=True)
+    # Filter original datasets to keep only representative sequences, using a join on the
+    # Accession index (the intersection keeps the original row order)
+    og_neg_indexed = og_neg.set_index('Accession')
+    og_pos_indexed = og_pos.set_index('Accession')
+    og_neg_filter = og_neg_indexed.loc[og_neg_indexed.index.intersection(rep_neg)].reset_index()
+    og_pos_filter = og_pos_indexed.loc[og_pos_indexed.index.intersection(rep_pos)].reset_index()
 
     # Save filtered datasets
     og_neg_filter.to_csv("filtered_neg_dataset.tsv", sep="\t", index=False)
@@ -70,9 +73,12 @@ def main():
     pos_test['label'] = 1
     neg_test['label'] = 0
 
-    # Combine and shuffle datasets
-    train_df = pd.concat([pos_train, neg_train], axis=0).sample(frac=1, random_state=42).reset_index(drop=True)
-    test_df = pd.concat([pos_test, neg_test], axis=0).sample(frac=1, random_state=42).reset_index(drop=True)
+    # Combine and shuffle datasets. RandomState(42).permutation gives the same order as
+    # sample(frac=1, random_state=42), so the existing splits and folds are kept
+    train_df = pd.concat([pos_train, neg_train], axis=0, ignore_index=True)
+    train_df = train_df.iloc[np.random.RandomState(42).permutation(len(train_df))].reset_index(drop=True)
+    test_df = pd.concat([pos_test, neg_test], axis=0, ignore_index=True)
+    test_df = test_df.iloc[np.random.RandomState(42).permutation(len(test_df))].reset_index(drop=True)
 
     # Create 5-fold cross-validation subsets
     train_df['fold'] = -1
@@ -80,6 +86,10 @@ def main():
     for fold_num, (train_index, val_index) in enumerate(skf.split(train_df, train_df['label'])):
         train_df.loc[val_index, 'fold'] = fold_num
 
+    # Labels are 0/1, so int8 is enough; both sets share the dtype, so it survives the merge
+    train_df['label'] = train_df['label'].astype('int8')
+    test_df['label'] = test_df['label'].astype('int8')
+
     print("Value counts for each fold:")
     print(train_df['fold'].value_counts())
     print("\nVerifying the positive/negative ratio in each fold:")
@@ -98,22 +108,30 @@ def main():
     with open(merged_fasta_file, 'wb') as outfile:
         for fasta_file in [neg_fasta_file, pos_fasta_file]:
             with open(fasta_file, 'rb') as infile:
-                outfile.write(infile.read())
+                # Stream in 1 MiB chunks instead of loading the whole file
+                shutil.copyfileobj(infile, outfile, 1 << 20)
 
     # Parse FASTA and add sequences to the merged dataframe
     fasta_sequences = parse_fasta(merged_fasta_file)
-    merged_df["Sequence"] = merged_df['Accession'].map(fasta_sequences)
+    # Look up every accession at once through integer codes into the FASTA ids; code -1
+    # (accession missing from the FASTA) picks the trailing NaN
+    accession_codes = pd.Index(list(fasta_sequences.keys())).get_indexer(merged_df['Accession'])
+    sequence_array = np.array(list(fasta_sequences.values()) + [np.nan], dtype=object)
+    merged_df["Sequence"] = sequence_array[accession_codes]
 
     # Save the final merged dataset with sequences
     merged_df.to_csv("merged_dataset_with_seqs.tsv", sep="\t", index=False)
 
     # --- Generate Summary Table ---
-    train_n = merged_df[merged_df["Type"] == "train"].shape[0]
-    test_n = merged_df[merged_df["Type"] == "test"].shape[0]
-    train_label_n_1 = merged_df[(merged_df["Type"] == "train") & (merged_df["label"] == 1)].shape[0]
-    train_label_n_0 = merged_df[(merged_df["Type"] == "train") & (merged_df["label"] == 0)].shape[0]
-    test_label_n_1 = merged_df[(merged_df["Type"] == "test") & (merged_df["label"] == 1)].shape[0]
-    test_label_n_0 = merged_df[(merged_df["Type"] == "test") & (merged_df["label"] == 0)].shape[0]
+    # Count every (Type, label) combination in a single pass
+    counts = merged_df.groupby(["Type", "label"], observed=True, sort=False).size()
+    type_counts = counts.groupby(level=0).sum()
+    train_n = type_counts.get("train", 0)
+    test_n = type_counts.get("test", 0)
+    train_label_n_1 = counts.get(("train", 1), 0)
+    train_label_n_0 = counts.get(("train", 0), 0)
+    test_label_n_1 = counts.get(("test", 1), 0)
+    test_label_n_0 = counts.get(("test", 0), 0)
 
     neg_before_cluster_n = og_neg.shape[0]
     pos_before_cluster_n = og_pos.shape[0]